@@ -0,0 +1,1237 @@
+#!/usr/bin/env python3
+"""Render a Salesforce Flow (.flow-meta.xml) as a PNG diagram.
+
+Parses the flow metadata XML and draws a rough approximation of the Flow
+Builder canvas: a card per element (start, decisions, record operations,
+assignments), orthogonally routed connectors with arrowheads and labelled
+decision outcomes, and an implicit End node wherever a path terminates.
+
+Usage:
+    python scripts/render_flow_png.py --in MyFlow.flow-meta.xml --out MyFlow.png
+
+Optional accelerators, picked up automatically when installed: lxml
+(faster XML parsing), opencv-python (batched connector strokes), and
+pillow-simd, an ABI-compatible drop-in for Pillow whose SSE4/AVX2
+builds speed up the fill/composite paths this script leans on. Check
+`python -c "import PIL; print(PIL.__version__)"` -- pillow-simd
+versions carry a ".postN" suffix.
+"""
+
+import argparse
+import glob
+import math
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+try:
+    from lxml import etree as ET
+    _HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    _HAVE_LXML = False
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+PALETTE = {
+    "Start": (45, 125, 80),
+    "End": (84, 105, 120),
+    "Decision": (230, 126, 34),
+    "Get Records": (214, 57, 138),
+    "Create Records": (214, 57, 138),
+    "Update Records": (214, 57, 138),
+    "Assignment": (226, 153, 27),
+}
+
+
+# ---------------------------------------------------------------------------
+# XML helpers
+# ---------------------------------------------------------------------------
+
+def _t(el) -> str:
+    """Stripped text of an element, or "" if the element is missing/empty."""
+    if el is None:
+        return ""
+    return (el.text or "").strip()
+
+
+def _to_int(raw: str) -> int:
+    try:
+        return int(float(raw))
+    except ValueError:
+        return 0
+
+
+def _children_by_name(el) -> Dict[str, list]:
+    """Immediate children bucketed by localname in a single pass.
+
+    The parse handlers read several fields plus one or more repeated
+    child families from each subtree; one bucketing scan replaces a
+    find()/findall() walk per field.
+    """
+    out: Dict[str, list] = defaultdict(list)
+    for child in el:
+        tag = child.tag
+        # lxml iteration also yields comments/PIs, whose tag is a
+        # callable rather than a string.
+        if isinstance(tag, str):
+            out[tag.rpartition("}")[2]].append(child)
+    return out
+
+
+def _first_text(kids: Dict[str, list], name: str) -> str:
+    lst = kids.get(name)
+    return _t(lst[0]) if lst else ""
+
+
+def _connector_target(kids: Dict[str, list], name: str = "connector") -> str:
+    lst = kids.get(name)
+    if not lst:
+        return ""
+    return _first_text(_children_by_name(lst[0]), "targetReference")
+
+
+_VALUE_TAGS = frozenset({"elementReference", "stringValue", "numberValue",
+                         "booleanValue", "dateValue"})
+
+
+def _value_to_str(value_el) -> str:
+    """Render a <value>/<rightValue> element to a display string."""
+    if value_el is None:
+        return ""
+    # One scan over the immediate children beats a find() walk per
+    # candidate tag; these elements have a single typed child anyway.
+    for child in value_el:
+        tag = child.tag
+        if not isinstance(tag, str):
+            continue
+        lname = tag.rpartition("}")[2]
+        if lname in _VALUE_TAGS and child.text:
+            text = child.text.strip()
+            if not text:
+                continue
+            if lname == "stringValue":
+                return '"%s"' % text
+            return text
+    return ""
+
+
+_OP_MAP = {
+    "EqualTo": "=",
+    "NotEqualTo": "≠",
+    "GreaterThan": ">",
+    "GreaterThanOrEqualTo": "≥",
+    "LessThan": "<",
+    "LessThanOrEqualTo": "≤",
+    "Contains": "contains",
+    "StartsWith": "starts with",
+}
+_TRUE = frozenset({"true", "1"})
+_FALSE = frozenset({"false", "0"})
+
+
+def _op_to_str(op: str, right: str) -> str:
+    if op == "IsNull":
+        val = right.strip().lower()
+        if val in _TRUE:
+            return "is null"
+        if val in _FALSE:
+            return "is not null"
+        return "is null?"
+    return _OP_MAP.get(op, op or "?")
+
+
+def _condition_to_str(cond_el) -> str:
+    """One <conditions>/<filters> element -> e.g. 'Status = "Open"'."""
+    kids = _children_by_name(cond_el)
+    left = (_first_text(kids, "leftValueReference")
+            or _first_text(kids, "field"))
+    op = _first_text(kids, "operator")
+    # Decision conditions carry their operand in <rightValue>; record
+    # filters (FlowRecordFilter) use <value> for the same thing.
+    rv = kids.get("rightValue") or kids.get("value")
+    right = _value_to_str(rv[0]) if rv else ""
+    op_s = _op_to_str(op, right)
+    if op == "IsNull":
+        return "%s %s" % (left, op_s)
+    return "%s %s %s" % (left, op_s, right)
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Node:
+    key: str
+    type: str
+    label: str
+    x: float
+    y: float
+    w: int = 220
+    h: int = 92
+    details: List[str] = field(default_factory=list)
+    meta: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Edge:
+    src: str
+    dst: str
+    label: str = ""
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+_TRIGGER_LABELS = {
+    "RecordAfterSave": "Record-Triggered (After Save)",
+    "RecordBeforeSave": "Record-Triggered (Before Save)",
+    "Scheduled": "Schedule-Triggered",
+    "PlatformEvent": "Platform Event-Triggered",
+}
+_RECORD_TRIGGER_LABELS = {
+    "Create": "on Create",
+    "Update": "on Update",
+    "CreateAndUpdate": "on Create or Update",
+    "Delete": "on Delete",
+}
+_ASSIGN_OPS = {
+    "Assign": "=",
+    "Add": "+=",
+    "Subtract": "-=",
+    "AssignCount": "= count of",
+}
+
+
+def _handle_start(el, nodes: Dict[str, Node], edges: List[Edge]) -> None:
+    kids = _children_by_name(el)
+    details = []
+    trig = _first_text(kids, "triggerType")
+    if trig:
+        details.append(_TRIGGER_LABELS.get(trig, trig))
+    rtt = _first_text(kids, "recordTriggerType")
+    if rtt:
+        details.append(_RECORD_TRIGGER_LABELS.get(rtt, rtt))
+    obj = _first_text(kids, "object")
+    if obj:
+        details.append("Object: %s" % obj)
+    nodes["__start__"] = Node(
+        key="__start__", type="Start", label="Start",
+        x=_to_int(_first_text(kids, "locationX")) or 50,
+        y=_to_int(_first_text(kids, "locationY")) or 50,
+        details=details, meta={"object": obj},
+    )
+    tgt = _connector_target(kids)
+    if tgt:
+        edges.append(Edge("__start__", tgt))
+
+
+def _handle_decision(el, nodes: Dict[str, Node], edges: List[Edge]) -> None:
+    kids = _children_by_name(el)
+    name = _first_text(kids, "name")
+    det: List[str] = []
+    for r in kids.get("rules", ()):
+        rkids = _children_by_name(r)
+        rule_label = (_first_text(rkids, "label")
+                      or _first_text(rkids, "name"))
+        conds = [_condition_to_str(c) for c in rkids.get("conditions", ())]
+        if conds:
+            det.append("%s: %s" % (rule_label, " AND ".join(conds)))
+        tgt = _connector_target(rkids)
+        if tgt:
+            edges.append(Edge(name, tgt, label=rule_label))
+    dflt = _connector_target(kids, "defaultConnector")
+    if dflt:
+        edges.append(Edge(name, dflt,
+                          label=_first_text(kids, "defaultConnectorLabel")
+                          or "Default"))
+    nodes[name] = Node(
+        key=name, type="Decision",
+        label=_first_text(kids, "label") or name,
+        x=_to_int(_first_text(kids, "locationX")),
+        y=_to_int(_first_text(kids, "locationY")),
+        w=160, h=80, details=det,
+    )
+
+
+def _handle_record(el, nodes: Dict[str, Node], edges: List[Edge],
+                   type_label: str) -> None:
+    """Shared handler for recordLookups/recordCreates/recordUpdates.
+
+    The three element families are structurally identical apart from
+    which of filters/inputAssignments they carry, so one body serves
+    all of them; absent families simply contribute nothing.
+    """
+    kids = _children_by_name(el)
+    name = _first_text(kids, "name")
+    obj = _first_text(kids, "object")
+    det = []
+    if obj:
+        det.append("Object: %s" % obj)
+    filters = [_condition_to_str(flt) for flt in kids.get("filters", ())]
+    if filters:
+        logic = _first_text(kids, "filterLogic") or "and"
+        det.append("Where: %s" % ((" %s " % logic).join(filters)))
+    for ia in kids.get("inputAssignments", ()):
+        ia_kids = _children_by_name(ia)
+        val = ia_kids.get("value")
+        det.append("Set: %s = %s" % (
+            _first_text(ia_kids, "field"),
+            _value_to_str(val[0]) if val else ""))
+    nodes[name] = Node(
+        key=name, type=type_label,
+        label=_first_text(kids, "label") or name,
+        x=_to_int(_first_text(kids, "locationX")),
+        y=_to_int(_first_text(kids, "locationY")),
+        details=det, meta={"object": obj},
+    )
+    tgt = _connector_target(kids)
+    if tgt:
+        edges.append(Edge(name, tgt))
+
+
+def _handle_assignment(el, nodes: Dict[str, Node],
+                       edges: List[Edge]) -> None:
+    kids = _children_by_name(el)
+    name = _first_text(kids, "name")
+    det = []
+    for item in kids.get("assignmentItems", ()):
+        item_kids = _children_by_name(item)
+        ref = _first_text(item_kids, "assignToReference")
+        op = _first_text(item_kids, "operator")
+        op_s = _ASSIGN_OPS.get(op, op or "=")
+        val = item_kids.get("value")
+        det.append("%s %s %s" % (
+            ref, op_s, _value_to_str(val[0]) if val else ""))
+    nodes[name] = Node(
+        key=name, type="Assignment",
+        label=_first_text(kids, "label") or name,
+        x=_to_int(_first_text(kids, "locationX")),
+        y=_to_int(_first_text(kids, "locationY")),
+        details=det,
+    )
+    tgt = _connector_target(kids)
+    if tgt:
+        edges.append(Edge(name, tgt))
+
+
+RECORD_OPS = (
+    ("recordLookups", "Get Records"),
+    ("recordCreates", "Create Records"),
+    ("recordUpdates", "Update Records"),
+)
+
+DISPATCH = {
+    "start": _handle_start,
+    "decisions": _handle_decision,
+    "assignments": _handle_assignment,
+}
+DISPATCH.update(
+    (tag, partial(_handle_record, type_label=type_label))
+    for tag, type_label in RECORD_OPS)
+
+
+def parse_flow(xml_path: str) -> Tuple[Dict[str, Node], List[Edge], str]:
+    """Parse a .flow-meta.xml file into nodes, edges and the flow label.
+
+    Streams the document with a single iterparse pass, dispatching each
+    top-level element to its handler and freeing it afterwards, so parse
+    cost and memory stay linear in the file size rather than growing
+    with one full-tree sweep per element family.
+    """
+    nodes: Dict[str, Node] = {}
+    edges: List[Edge] = []
+    flow_label = ""
+
+    depth = 0
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        tag = elem.tag.rsplit("}", 1)[-1]
+        if tag == "label" and not flow_label:
+            flow_label = _t(elem)
+        else:
+            handler = DISPATCH.get(tag)
+            if handler is not None:
+                handler(elem, nodes, edges)
+        # Free the processed subtree; connector targets are plain strings
+        # by now, so forward references resolve in the post-pass below.
+        elem.clear()
+        if _HAVE_LXML:
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    flow_label = flow_label or os.path.basename(xml_path)
+
+    # Drop edges whose target element type we do not render.
+    edges = [e for e in edges if e.src in nodes and e.dst in nodes or
+             e.src in nodes and not e.dst]
+
+    # Synthesize an End node under every element with no outgoing connector.
+    has_out = {e.src for e in edges}
+    ends: List[Node] = []
+    for n in list(nodes.values()):
+        if n.type == "End" or n.key in has_out:
+            continue
+        end = Node(key="__end_%s" % n.key, type="End", label="End",
+                   x=n.x, y=n.y + 140, w=60, h=60)
+        nodes[end.key] = end
+        edges.append(Edge(n.key, end.key))
+        ends.append(end)
+
+    # Nudge overlapping End nodes apart. An 80px spatial hash keeps this
+    # linear: each node only tests occupants of the nine cells around it
+    # instead of every previously placed End node. A single End node
+    # cannot collide, so the common small-flow case skips this entirely.
+    if len(ends) > 1:
+        ends.sort(key=lambda n: (n.x, n.y))
+        buckets: Dict[Tuple[int, int], List[Node]] = defaultdict(list)
+        for n in ends:
+            while True:
+                kx, ky = int(n.x) // 80, int(n.y) // 80
+                clash = any(
+                    abs(n.x - o.x) < 80 and abs(n.y - o.y) < 80
+                    for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                    for o in buckets.get((kx + dx, ky + dy), ()))
+                if not clash:
+                    break
+                n.y += 90
+            buckets[(kx, ky)].append(n)
+
+    edges = [e for e in edges if e.src in nodes and e.dst in nodes]
+    return nodes, edges, flow_label
+
+
+# ---------------------------------------------------------------------------
+# Drawing helpers
+# ---------------------------------------------------------------------------
+
+_FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+)
+
+
+@lru_cache(maxsize=1)
+def _base_font():
+    """First available TTF, opened once per process (None if none exist)."""
+    for path in _FONT_CANDIDATES:
+        if os.path.exists(path):
+            return ImageFont.truetype(path, 12)
+    return None
+
+
+@lru_cache(maxsize=64)
+def _load_font(size: int):
+    base = _base_font()
+    if base is None:
+        return ImageFont.load_default()
+    # font_variant resizes off the already-open FreeType face instead of
+    # re-reading the TTF from disk for every size.
+    return base.font_variant(size=size)
+
+
+# Measured glyph widths for printable ASCII, keyed by (id(font), ord(ch)).
+_CHAR_W: Dict[Tuple[int, int], float] = {}
+
+
+def _text_w(text: str, font) -> float:
+    """Pixel width of `text`, summed from a per-font ASCII width table.
+
+    The table is filled once per font via font.getlength, which needs no
+    draw context; strings with non-ASCII characters fall back to a real
+    measurement. Ignoring kerning is fine for a grid-snapped layout like
+    this one.
+    """
+    fid = id(font)
+    if (fid, 32) not in _CHAR_W:
+        for code in range(32, 127):
+            _CHAR_W[(fid, code)] = font.getlength(chr(code))
+    total = 0.0
+    table = _CHAR_W
+    for ch in text:
+        cw = table.get((fid, ord(ch)))
+        if cw is None:
+            return font.getlength(text)
+        total += cw
+    return total
+
+
+@lru_cache(maxsize=4096)
+def _wrap(text: str, font, max_w: int) -> Tuple[str, ...]:
+    """Greedy word wrap of `text` so each line fits in max_w pixels.
+
+    Memoized: the same label is wrapped at the same width by both the
+    layout and draw passes (and again per file in batch mode), so the
+    result is cached as an immutable tuple.
+    """
+    words = text.split()
+    lines: List[str] = []
+    line = ""
+    line_w = 0.0
+    space_w = _text_w(" ", font)
+    for word in words:
+        word_w = _text_w(word, font)
+        if not line:
+            line, line_w = word, word_w
+        elif line_w + space_w + word_w <= max_w:
+            line = line + " " + word
+            line_w += space_w + word_w
+        else:
+            lines.append(line)
+            line, line_w = word, word_w
+    if line:
+        lines.append(line)
+    return tuple(lines) or ("",)
+
+
+def _bbox_centered(n: Node, sx: float, sy: float) -> Tuple[int, int, int, int]:
+    w = int(n.w * sx)
+    h = int(n.h * sy)
+    x0 = int(n.x * sx) - w // 2
+    y0 = int(n.y * sy) - h // 2
+    return (x0, y0, x0 + w, y0 + h)
+
+
+def _node_geometry(nodes: Dict[str, Node], sx: float, sy: float,
+                   ) -> Tuple[Dict[str, Tuple[int, int, int, int]],
+                              Dict[str, Tuple[int, int]]]:
+    """Scaled bbox and center per node, computed once per render.
+
+    The edge pass needs both endpoints of every edge and the node pass
+    needs every node again; precomputing here means each bbox is
+    derived once instead of ~(4E + N) times.
+    """
+    bboxes = {k: _bbox_centered(n, sx, sy) for k, n in nodes.items()}
+    centers = {k: ((b[0] + b[2]) // 2, (b[1] + b[3]) // 2)
+               for k, b in bboxes.items()}
+    return bboxes, centers
+
+
+def _anchor(box: Tuple[int, int, int, int], center: Tuple[int, int],
+            ocenter: Tuple[int, int]) -> Tuple[int, int]:
+    """Point on the border of `box` facing the other node's center."""
+    cx, cy = center
+    ocx, ocy = ocenter
+    if abs(ocx - cx) > abs(ocy - cy):
+        return (box[2], cy) if ocx > cx else (box[0], cy)
+    return (cx, box[3]) if ocy > cy else (cx, box[1])
+
+
+def _arrowhead(x1: int, y1: int, x2: int, y2: int,
+               size: int) -> List[Tuple[int, int]]:
+    """Arrowhead triangle for the segment (x1, y1) -> (x2, y2).
+
+    Orthogonal routing makes the final segment vertical, so the common
+    case reduces to a sign branch with two precomputed integer offsets
+    (size times sin/cos of the 30-degree half-angle); the generic trig
+    path only runs for degenerate or diagonal segments.
+    """
+    half = int(round(size * 0.5))
+    depth = int(round(size * 0.8660254))
+    if x1 == x2 and y1 != y2:
+        if y2 > y1:
+            return [(x2, y2), (x2 - half, y2 - depth),
+                    (x2 + half, y2 - depth)]
+        return [(x2, y2), (x2 + half, y2 + depth),
+                (x2 - half, y2 + depth)]
+    if y1 == y2 and x1 != x2:
+        if x2 > x1:
+            return [(x2, y2), (x2 - depth, y2 + half),
+                    (x2 - depth, y2 - half)]
+        return [(x2, y2), (x2 + depth, y2 - half),
+                (x2 + depth, y2 + half)]
+    ang = math.atan2(y2 - y1, x2 - x1)
+    left = ang + math.pi - math.pi / 6
+    right = ang + math.pi + math.pi / 6
+    return [
+        (x2, y2),
+        (int(x2 + size * math.cos(left)), int(y2 + size * math.sin(left))),
+        (int(x2 + size * math.cos(right)), int(y2 + size * math.sin(right))),
+    ]
+
+
+def _rounded_rect(draw, box, r, fill, outline=None, width=1):
+    draw.rounded_rectangle(box, radius=r, fill=fill, outline=outline,
+                           width=width)
+
+
+@lru_cache(maxsize=4096)
+def _text_sprite(text: str, font, fill) -> Image.Image:
+    """Rasterized text run, shaped once per (text, font, fill)."""
+    x0, y0, x1, y1 = font.getbbox(text)
+    sprite = Image.new("RGBA", (max(1, int(x1)), max(1, int(y1) + 2)),
+                       (0, 0, 0, 0))
+    ImageDraw.Draw(sprite).text((0, 0), text, font=font, fill=fill)
+    return sprite
+
+
+def _draw_text_cached(img, pos, text: str, font, fill) -> None:
+    """Composite a cached text sprite; repeated labels (node-type
+    headers, "End", common outcomes) skip FreeType entirely."""
+    sprite = _text_sprite(text, font, fill)
+    img.paste(sprite, (max(0, int(pos[0])), max(0, int(pos[1]))), sprite)
+
+
+@lru_cache(maxsize=64)
+def _pill_sprite(w: int, h: int, r: int) -> Image.Image:
+    """Edge-label pill with its drop shadow baked in, one per unique size."""
+    margin = 6
+    sprite = Image.new("RGBA", (w + 2 * margin + 3, h + 2 * margin + 4),
+                       (0, 0, 0, 0))
+    sd = ImageDraw.Draw(sprite)
+    sd.rounded_rectangle((margin + 3, margin + 4, margin + 3 + w,
+                          margin + 4 + h), radius=r, fill=(0, 0, 0, 28))
+    sprite = sprite.filter(ImageFilter.GaussianBlur(1.5))
+    sd = ImageDraw.Draw(sprite)
+    sd.rounded_rectangle((margin, margin, margin + w, margin + h), radius=r,
+                         fill=(255, 255, 255, 245),
+                         outline=(205, 205, 205, 255))
+    return sprite
+
+
+def _accumulate_shadows(sdraw, nodes: Dict[str, Node],
+                        bboxes: Dict[str, Tuple[int, int, int, int]],
+                        centers: Dict[str, Tuple[int, int]],
+                        f: float, font_tiny) -> None:
+    """Rasterize every node shadow into one shared grayscale mask.
+
+    All shadows are drawn as flat 28-grey shapes into a single "L"
+    image, which the caller blurs once and composites under the scene
+    in one paste -- replacing a blurred alpha composite per node.
+    """
+    r6 = int(round(6 * f))
+    r14 = int(round(14 * f))
+    r16 = int(round(16 * f))
+    call_w = int(round(420 * f))
+    ox, oy = 3, 4
+    for n in nodes.values():
+        box = bboxes[n.key]
+        sbox = (box[0] + ox, box[1] + oy, box[2] + ox, box[3] + oy)
+        if n.type == "End":
+            sdraw.ellipse(sbox, fill=28)
+        elif n.type == "Decision":
+            cx, cy = centers[n.key]
+            hw = (box[2] - box[0]) // 2
+            hh = (box[3] - box[1]) // 2
+            sdraw.polygon([(cx + ox, cy - hh + oy), (cx + hw + ox, cy + oy),
+                           (cx + ox, cy + hh + oy), (cx - hw + ox, cy + oy)],
+                          fill=28)
+            if n.details:
+                lines = 0
+                for d in n.details:
+                    lines += len(_wrap(d, font_tiny, call_w - r16))
+                call_h = lines * r14 + r16
+                cb = (cx + hw + r14, cy - call_h // 2,
+                      cx + hw + r14 + call_w, cy + call_h - call_h // 2)
+                sdraw.rounded_rectangle((cb[0] + ox, cb[1] + oy,
+                                         cb[2] + ox, cb[3] + oy),
+                                        radius=r6, fill=28)
+        else:
+            sdraw.rounded_rectangle(sbox, radius=r14, fill=28)
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+def _draw_edges(img, draw, edges: List[Edge],
+                bboxes: Dict[str, Tuple[int, int, int, int]],
+                centers: Dict[str, Tuple[int, int]],
+                f: float, font_small) -> None:
+    """Hot edge pass: connector geometry, batched strokes, label pills."""
+    r4 = int(round(4 * f))
+    r8 = int(round(8 * f))
+    r14 = int(round(14 * f))
+    # Geometry is collected per stroke style and stroked in one batch
+    # afterwards instead of crossing into the raster layer once per edge.
+    edge_col = (90, 90, 90)
+    edge_w = max(2, int(round(2 * f)))
+    segs_by_style: Dict[Tuple, List[List[Tuple[int, int]]]] = defaultdict(list)
+    heads_by_style: Dict[Tuple, List[List[Tuple[int, int]]]] = defaultdict(list)
+    edge_labels: List[Tuple[str, Tuple[int, int, int, int], int, int]] = []
+    if not edges:
+        return
+    # Anchor picks, elbow midpoints and arrowhead vertices for every
+    # edge in a handful of array ops; the loop below only packages the
+    # already-computed integers for the raster layer.
+    sb = np.array([bboxes[e.src] for e in edges], np.int64)
+    db = np.array([bboxes[e.dst] for e in edges], np.int64)
+    sc = np.array([centers[e.src] for e in edges], np.int64)
+    dc = np.array([centers[e.dst] for e in edges], np.int64)
+    dx = dc[:, 0] - sc[:, 0]
+    dy = dc[:, 1] - sc[:, 1]
+    horiz = np.abs(dx) > np.abs(dy)
+    x1 = np.where(horiz, np.where(dx > 0, sb[:, 2], sb[:, 0]), sc[:, 0])
+    y1 = np.where(horiz, sc[:, 1], np.where(dy > 0, sb[:, 3], sb[:, 1]))
+    x2 = np.where(horiz, np.where(dx < 0, db[:, 2], db[:, 0]), dc[:, 0])
+    y2 = np.where(horiz, dc[:, 1], np.where(dy < 0, db[:, 3], db[:, 1]))
+    midy = (y1 + y2) // 2
+    # The last segment is vertical, so the arrowhead angle normally
+    # only depends on the sign of (y2 - midy); for same-row edges that
+    # segment collapses to a point and the approach is horizontal.
+    dy_seg = y2 - midy
+    dx_seg = np.where(dy_seg == 0, x2 - x1, 0)
+    ang = np.arctan2(dy_seg, dx_seg)
+    left = ang + math.pi - math.pi / 6
+    right = ang + math.pi + math.pi / 6
+    hlx = (x2 + r8 * np.cos(left)).astype(np.int64)
+    hly = (y2 + r8 * np.sin(left)).astype(np.int64)
+    hrx = (x2 + r8 * np.cos(right)).astype(np.int64)
+    hry = (y2 + r8 * np.sin(right)).astype(np.int64)
+    for i, e in enumerate(edges):
+        ex1, ey1, ex2, ey2, emid = (int(x1[i]), int(y1[i]), int(x2[i]),
+                                    int(y2[i]), int(midy[i]))
+        segs_by_style[(edge_col, edge_w)].append(
+            [(ex1, ey1), (ex1, emid), (ex2, emid), (ex2, ey2)])
+        heads_by_style[edge_col].append(
+            [(ex2, ey2), (int(hlx[i]), int(hly[i])),
+             (int(hrx[i]), int(hry[i]))])
+        if e.label:
+            txt = e.label
+            tw = int(_text_w(txt, font_small))
+            th = r14
+            lx = (ex1 + ex2) // 2
+            ly = emid
+            box = (lx - tw // 2 - r8, ly - th // 2 - r4,
+                   lx + tw // 2 + r8, ly + th // 2 + r4)
+            edge_labels.append((txt, box, lx - tw // 2, ly - th // 2))
+
+    if cv2 is not None:
+        # One polylines + one fillPoly call per style on a NumPy view.
+        buf = np.array(img)
+        for (col, width), segs in segs_by_style.items():
+            cv2.polylines(buf, [np.asarray(s, np.int32) for s in segs],
+                          False, col, thickness=width,
+                          lineType=cv2.LINE_AA)
+        for col, heads in heads_by_style.items():
+            cv2.fillPoly(buf, [np.asarray(a, np.int32) for a in heads], col,
+                         lineType=cv2.LINE_AA)
+        img.paste(Image.fromarray(buf, "RGB"))
+    else:
+        # Bound methods resolved once; the per-segment loop is the
+        # hottest pure-Python path left on dense flows.
+        line = draw.line
+        polygon = draw.polygon
+        for (col, width), segs in segs_by_style.items():
+            for points in segs:
+                line(points, fill=col, width=width, joint="curve")
+        for col, heads in heads_by_style.items():
+            for ah in heads:
+                polygon(ah, fill=col)
+
+    # Composite one cached pill sprite per label; identically sized
+    # pills (common across decision outcomes) share a rasterization.
+    paste = img.paste
+    for txt, box, tx, ty in edge_labels:
+        sprite = _pill_sprite(box[2] - box[0], box[3] - box[1], r8)
+        paste(sprite, (max(0, box[0] - 6), max(0, box[1] - 6)), sprite)
+        _draw_text_cached(img, (tx, ty), txt, font_small,
+                          (70, 70, 70))
+
+
+@lru_cache(maxsize=256)
+def _card_sprite(ntype: str, label: str, details: Tuple[str, ...],
+                 w: int, h: int, col: Tuple[int, int, int], f: float,
+                 font_head, font_small, font_tiny) -> Image.Image:
+    """A full node card (or End circle) rendered once per visual identity.
+
+    Flows repeat the same element shapes constantly -- and batch mode
+    re-renders them per file -- so cards are drawn into an RGBA sprite
+    keyed by everything that affects their pixels and pasted wherever
+    they recur. Decisions stay inline: their label and callout extend
+    beyond the diamond's box.
+    """
+    sprite = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+    d = ImageDraw.Draw(sprite)
+    if ntype == "End":
+        d.ellipse((0, 0, w - 1, h - 1), fill=(255, 255, 255),
+                  outline=col, width=max(2, int(round(2 * f))))
+        tw = int(_text_w(label, font_head))
+        r8 = int(round(8 * f))
+        d.text((w // 2 - tw // 2, h // 2 - r8), label, font=font_head,
+               fill=col)
+        return sprite
+    r5 = int(round(5 * f))
+    r6 = int(round(6 * f))
+    r10 = int(round(10 * f))
+    r12 = int(round(12 * f))
+    r14 = int(round(14 * f))
+    r15 = int(round(15 * f))
+    r18 = int(round(18 * f))
+    r24 = int(round(24 * f))
+    _rounded_rect(d, (0, 0, w - 1, h - 1), r14, fill=(255, 255, 255),
+                  outline=(215, 215, 215))
+    d.rounded_rectangle((0, 0, w - 1, r24), radius=r14, fill=col)
+    d.rectangle((0, r14, w - 1, r24), fill=col)
+    d.text((r10, r5), ntype, font=font_tiny, fill=(255, 255, 255))
+    inner = w - r24
+    ty = r24 + r6
+    for ln in _wrap(label, font_head, inner):
+        d.text((r12, ty), ln, font=font_head, fill=(40, 40, 40))
+        ty += r18
+    for detail in details:
+        for ln in _wrap(detail, font_small, inner):
+            d.text((r12, ty), ln, font=font_small, fill=(110, 110, 110))
+            ty += r15
+    return sprite
+
+
+def _draw_nodes(img, draw, nodes: Dict[str, Node],
+                bboxes: Dict[str, Tuple[int, int, int, int]],
+                centers: Dict[str, Tuple[int, int]],
+                f: float, font_head, font_small, font_tiny) -> None:
+    """Hot node pass: sprite pastes for cards/ends, inline diamonds."""
+    r6 = int(round(6 * f))
+    r8 = int(round(8 * f))
+    r14 = int(round(14 * f))
+    r16 = int(round(16 * f))
+    deci_label_w = int(round(180 * f))
+    call_w = int(round(420 * f))
+    paste = img.paste
+    palette_get = PALETTE.get
+    for n in nodes.values():
+        box = bboxes[n.key]
+        col = palette_get(n.type, (100, 100, 100))
+        if n.type == "End":
+            sprite = _card_sprite(n.type, n.label, (), box[2] - box[0],
+                                  box[3] - box[1], col, f, font_head,
+                                  font_small, font_tiny)
+            paste(sprite, (box[0], box[1]), sprite)
+        elif n.type == "Decision":
+            cx, cy = centers[n.key]
+            hw = (box[2] - box[0]) // 2
+            hh = (box[3] - box[1]) // 2
+            diamond = [(cx, cy - hh), (cx + hw, cy), (cx, cy + hh),
+                       (cx - hw, cy)]
+            draw.polygon(diamond, fill=(255, 255, 255), outline=col)
+            label_lines = _wrap(n.label, font_head, deci_label_w)
+            ty = cy + hh + r6
+            for ln in label_lines:
+                tw = int(_text_w(ln, font_head))
+                _draw_text_cached(img, (cx - tw // 2, ty), ln, font_head,
+                                  (60, 60, 60))
+                ty += r16
+            if n.details:
+                # Conditions callout to the right of the diamond.
+                lines: List[str] = []
+                for d in n.details:
+                    lines.extend(_wrap(d, font_tiny, call_w - r16))
+                call_h = len(lines) * r14 + r16
+                cb = (cx + hw + r14, cy - call_h // 2,
+                      cx + hw + r14 + call_w,
+                      cy + call_h - call_h // 2)
+                _rounded_rect(draw, cb, r6, fill=(255, 252, 240),
+                              outline=(225, 215, 185))
+                ty = cb[1] + r8
+                for ln in lines:
+                    _draw_text_cached(img, (cb[0] + r8, ty), ln,
+                                      font_tiny, (90, 80, 50))
+                    ty += r14
+        else:
+            sprite = _card_sprite(n.type, n.label, tuple(n.details),
+                                  box[2] - box[0], box[3] - box[1], col,
+                                  f, font_head, font_small, font_tiny)
+            paste(sprite, (box[0], box[1]), sprite)
+
+
+def _layout(nodes: Dict[str, Node], sx: float, sy: float, f: float,
+            font_head, font_small) -> Tuple[int, int, int, int]:
+    """Auto-size cards, rebase coordinates and compute the canvas size.
+
+    Shared by the PNG and SVG backends. Returns (w, h, pad, header_h).
+    """
+    r15 = int(round(15 * f))
+    r16 = int(round(16 * f))
+    r18 = int(round(18 * f))
+    r24 = int(round(24 * f))
+
+    # Auto-size card heights from wrapped label/detail line counts.
+    for n in nodes.values():
+        if n.type in ("Decision", "End"):
+            continue
+        inner = int(n.w * sx) - r24
+        label_lines = _wrap(n.label, font_head, inner)
+        detail_lines = []
+        for d in n.details:
+            detail_lines.extend(_wrap(d, font_small, inner))
+        need = (r24 + len(label_lines) * r18 +
+                len(detail_lines) * r15 + r16)
+        n.h = max(92, int(need / sy))
+
+    # Canvas extents and rebasing in one NumPy pass rather than four
+    # generator sweeps plus a Python loop over every node.
+    node_list = list(nodes.values())
+    arr = np.fromiter(
+        (v for n in node_list for v in (n.x, n.y, n.w, n.h)),
+        dtype=np.float64, count=len(node_list) * 4).reshape(-1, 4)
+    half_w = arr[:, 2] / 2
+    half_h = arr[:, 3] / 2
+    minx = float((arr[:, 0] - half_w).min())
+    miny = float((arr[:, 1] - half_h).min())
+    maxx = float((arr[:, 0] + half_w).max())
+    maxy = float((arr[:, 1] + half_h).max())
+
+    # Detail-bearing decisions draw a conditions callout to the right
+    # of the diamond; reserve its footprint so it isn't clipped at the
+    # canvas edge.
+    call_ext = (int(round(14 * f)) + int(round(420 * f))) / sx
+    for n in node_list:
+        if n.type == "Decision" and n.details:
+            maxx = max(maxx, n.x + n.w / 2 + call_ext)
+
+    pad = int(round(60 * f))
+    header_h = int(round(70 * f))
+    arr[:, 0] += pad / sx - minx
+    arr[:, 1] += (pad + header_h) / sy - miny
+    for n, (nx, ny) in zip(node_list, arr[:, :2]):
+        n.x = nx
+        n.y = ny
+    w = int((maxx - minx) * sx) + 2 * pad
+    h = int((maxy - miny) * sy) + 2 * pad + header_h
+    return w, h, pad, header_h
+
+
+def render(nodes: Dict[str, Node], edges: List[Edge], title: str,
+           out_png: str, scale: float = 1.0,
+           compress_level: int = 6, fast: bool = False) -> None:
+    f = scale
+    sx = sy = f
+
+    font_title = _load_font(int(round(18 * f)))
+    font_head = _load_font(int(round(13 * f)))
+    font_small = _load_font(int(round(11 * f)))
+    font_tiny = _load_font(int(round(10 * f)))
+
+    r1 = max(1, int(round(1 * f)))
+    r24 = int(round(24 * f))
+    w, h, pad, header_h = _layout(nodes, sx, sy, f, font_head, font_small)
+
+    # Background and the faint Flow Builder grid in one allocation: a
+    # 48px tile repeated with np.tile, instead of a Pillow line call per
+    # row and column of the canvas.
+    grid = int(round(48 * f))
+    tile = np.full((grid, grid, 3), (243, 242, 242), np.uint8)
+    # Grid-line grey premultiplied onto the background, since the RGB
+    # canvas carries no alpha channel.
+    tile[0, :] = (240, 239, 239)
+    tile[:, 0] = (240, 239, 239)
+    bg = np.ascontiguousarray(
+        np.tile(tile, (h // grid + 1, w // grid + 1, 1))[:h, :w])
+    img = Image.fromarray(bg, "RGB")
+    draw = ImageDraw.Draw(img)
+
+    # Title header.
+    draw.text((pad, r24), title, font=font_title, fill=(40, 40, 40))
+    draw.line((pad, header_h, w - pad, header_h), fill=(210, 210, 210),
+              width=r1)
+
+    bboxes, centers = _node_geometry(nodes, sx, sy)
+
+    # One full-canvas shadow layer: flat shapes accumulated into a
+    # grayscale mask, blurred once, composited in a single paste.
+    shadow = Image.new("L", (w, h), 0)
+    _accumulate_shadows(ImageDraw.Draw(shadow), nodes, bboxes, centers,
+                        f, font_tiny)
+    img.paste((0, 0, 0), (0, 0), shadow.filter(ImageFilter.GaussianBlur(1.5)))
+
+    _draw_edges(img, draw, edges, bboxes, centers, f, font_small)
+    _draw_nodes(img, draw, nodes, bboxes, centers, f, font_head,
+                font_small, font_tiny)
+
+    # The RGB canvas saves directly; no mode conversion copy is needed.
+    if fast:
+        # The SLDS-ish palette plus antialiasing fits comfortably in 64
+        # colors; a palette PNG encodes and compresses much faster.
+        img = img.quantize(colors=64, method=Image.Quantize.MEDIANCUT)
+    img.save(out_png, format="PNG", optimize=False,
+             compress_level=compress_level)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _hex(col: Tuple[int, int, int]) -> str:
+    return "#%02x%02x%02x" % col
+
+
+def render_svg(nodes: Dict[str, Node], edges: List[Edge], title: str,
+               out_path: str, scale: float = 1.0) -> None:
+    """Write the diagram as an SVG document.
+
+    The scene is rectangles, polylines and text, so emitting vector
+    primitives directly is pure string formatting: no canvas
+    allocation, rasterization or PNG encode. Fonts are only used to
+    size the layout; the output defers glyph rendering to the viewer.
+    """
+    f = scale
+    sx = sy = f
+    font_head = _load_font(int(round(13 * f)))
+    font_small = _load_font(int(round(11 * f)))
+    font_tiny = _load_font(int(round(10 * f)))
+
+    r6 = int(round(6 * f))
+    r8 = int(round(8 * f))
+    r14 = int(round(14 * f))
+    r16 = int(round(16 * f))
+    r18 = int(round(18 * f))
+    r24 = int(round(24 * f))
+    grid = int(round(48 * f))
+
+    w, h, pad, header_h = _layout(nodes, sx, sy, f, font_head, font_small)
+
+    out: List[str] = [
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" '
+        'viewBox="0 0 %d %d" font-family="DejaVu Sans, sans-serif">'
+        % (w, h, w, h),
+        '<defs><pattern id="grid" width="%d" height="%d" '
+        'patternUnits="userSpaceOnUse">'
+        '<path d="M %d 0 L 0 0 0 %d" fill="none" stroke="#e6e5e5" '
+        'stroke-width="1"/></pattern></defs>' % (grid, grid, grid, grid),
+        '<rect width="100%" height="100%" fill="#f3f2f2"/>',
+        '<rect width="100%" height="100%" fill="url(#grid)"/>',
+        '<text x="%d" y="%d" font-size="%d" fill="#282828">%s</text>'
+        % (pad, r24 + r18, r18, escape(title)),
+        '<line x1="%d" y1="%d" x2="%d" y2="%d" stroke="#d2d2d2"/>'
+        % (pad, header_h, w - pad, header_h),
+    ]
+
+    bboxes, centers = _node_geometry(nodes, sx, sy)
+
+    for e in edges:
+        x1, y1 = _anchor(bboxes[e.src], centers[e.src], centers[e.dst])
+        x2, y2 = _anchor(bboxes[e.dst], centers[e.dst], centers[e.src])
+        midy = (y1 + y2) // 2
+        out.append(
+            '<path d="M %d %d L %d %d L %d %d L %d %d" fill="none" '
+            'stroke="#5a5a5a" stroke-width="%d"/>'
+            % (x1, y1, x1, midy, x2, midy, x2, y2, max(2, int(round(2 * f)))))
+        if midy == y2:
+            # Same-row edges: the vertical segment is zero-length, so
+            # aim the head along the horizontal approach instead.
+            ah = _arrowhead(x1, y2, x2, y2, r8)
+        else:
+            ah = _arrowhead(x2, midy, x2, y2, r8)
+        out.append('<polygon points="%s" fill="#5a5a5a"/>'
+                   % " ".join("%d,%d" % p for p in ah))
+        if e.label:
+            tw = int(_text_w(e.label, font_small))
+            lx = (x1 + x2) // 2
+            out.append(
+                '<rect x="%d" y="%d" width="%d" height="%d" rx="%d" '
+                'fill="#ffffff" stroke="#cdcdcd"/>'
+                % (lx - tw // 2 - r8, midy - r14 // 2 - r6 // 2,
+                   tw + 2 * r8, r14 + r6, r8))
+            out.append(
+                '<text x="%d" y="%d" font-size="%d" text-anchor="middle" '
+                'fill="#464646">%s</text>'
+                % (lx, midy + r14 // 3, int(round(11 * f)), escape(e.label)))
+
+    for n in nodes.values():
+        box = bboxes[n.key]
+        col = _hex(PALETTE.get(n.type, (100, 100, 100)))
+        cx, cy = centers[n.key]
+        if n.type == "End":
+            out.append(
+                '<circle cx="%d" cy="%d" r="%d" fill="#ffffff" '
+                'stroke="%s" stroke-width="2"/>'
+                % (cx, cy, (box[2] - box[0]) // 2, col))
+            out.append(
+                '<text x="%d" y="%d" font-size="%d" text-anchor="middle" '
+                'fill="%s">%s</text>'
+                % (cx, cy + r6 // 2 + 2, int(round(13 * f)), col,
+                   escape(n.label)))
+        elif n.type == "Decision":
+            hw = (box[2] - box[0]) // 2
+            hh = (box[3] - box[1]) // 2
+            pts = ((cx, cy - hh), (cx + hw, cy), (cx, cy + hh),
+                   (cx - hw, cy))
+            out.append('<polygon points="%s" fill="#ffffff" stroke="%s"/>'
+                       % (" ".join("%d,%d" % p for p in pts), col))
+            ty = cy + hh + r16
+            for ln in _wrap(n.label, font_head, int(round(180 * f))):
+                out.append(
+                    '<text x="%d" y="%d" font-size="%d" '
+                    'text-anchor="middle" fill="#3c3c3c">%s</text>'
+                    % (cx, ty, int(round(13 * f)), escape(ln)))
+                ty += r16
+            if n.details:
+                # Conditions callout to the right of the diamond,
+                # mirroring the raster backend.
+                call_w = int(round(420 * f))
+                lines: List[str] = []
+                for d in n.details:
+                    lines.extend(_wrap(d, font_tiny, call_w - r16))
+                call_h = len(lines) * r14 + r16
+                cb_x = cx + hw + r14
+                cb_y = cy - call_h // 2
+                out.append(
+                    '<rect x="%d" y="%d" width="%d" height="%d" rx="%d" '
+                    'fill="#fffcf0" stroke="#e1d7b9"/>'
+                    % (cb_x, cb_y, call_w, call_h, r6))
+                ty = cb_y + r14
+                for ln in lines:
+                    out.append(
+                        '<text x="%d" y="%d" font-size="%d" '
+                        'fill="#5a5032">%s</text>'
+                        % (cb_x + r8, ty, int(round(10 * f)), escape(ln)))
+                    ty += r14
+        else:
+            bw = box[2] - box[0]
+            out.append(
+                '<rect x="%d" y="%d" width="%d" height="%d" rx="%d" '
+                'fill="#ffffff" stroke="#d7d7d7"/>'
+                % (box[0], box[1], bw, box[3] - box[1], r14))
+            out.append(
+                '<rect x="%d" y="%d" width="%d" height="%d" rx="%d" '
+                'fill="%s"/>'
+                % (box[0], box[1], bw, r24, r14, col))
+            out.append(
+                '<rect x="%d" y="%d" width="%d" height="%d" fill="%s"/>'
+                % (box[0], box[1] + r14, bw, r24 - r14, col))
+            out.append(
+                '<text x="%d" y="%d" font-size="%d" fill="#ffffff">%s'
+                '</text>'
+                % (box[0] + r8, box[1] + r16, int(round(10 * f)),
+                   escape(n.type)))
+            inner = bw - r24
+            ty = box[1] + r24 + r16
+            for ln in _wrap(n.label, font_head, inner):
+                out.append(
+                    '<text x="%d" y="%d" font-size="%d" fill="#282828">'
+                    '%s</text>'
+                    % (box[0] + r14, ty, int(round(13 * f)), escape(ln)))
+                ty += r18
+            for d in n.details:
+                for ln in _wrap(d, font_small, inner):
+                    out.append(
+                        '<text x="%d" y="%d" font-size="%d" '
+                        'fill="#6e6e6e">%s</text>'
+                        % (box[0] + r14, ty, int(round(11 * f)),
+                           escape(ln)))
+                    ty += int(round(15 * f))
+
+    out.append("</svg>")
+    with open(out_path, "w", encoding="utf-8") as fh:
+        fh.write("\n".join(out))
+
+
+def _default_out(in_path: str, ext: str = ".png") -> str:
+    base = in_path
+    for suffix in (".flow-meta.xml", ".xml"):
+        if base.endswith(suffix):
+            base = base[: -len(suffix)]
+            break
+    return base + ext
+
+
+def _render_one(job: Tuple[str, str, float, int, str, bool]) -> str:
+    """Parse and render a single flow; worker entry for batch mode."""
+    in_path, out_path, scale, compress_level, fmt, fast = job
+    nodes, edges, flow_label = parse_flow(in_path)
+    if not nodes:
+        return "no renderable elements found in %s" % in_path
+    if fmt == "svg":
+        render_svg(nodes, edges, flow_label, out_path, scale=scale)
+    else:
+        render(nodes, edges, flow_label, out_path, scale=scale,
+               compress_level=compress_level, fast=fast)
+    return "wrote %s (%d nodes, %d edges)" % (out_path, len(nodes),
+                                              len(edges))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(
+        description="Render Salesforce Flow XML files to PNG diagrams.")
+    ap.add_argument("--in", dest="in_path",
+                    help="a .flow-meta.xml file, or a directory to "
+                         "render recursively")
+    ap.add_argument("--out", dest="out_path",
+                    help="output PNG path (default: input with .png)")
+    ap.add_argument("--in-glob", dest="in_glob", metavar="PATTERN",
+                    help="render every flow matching this glob "
+                         "(** patterns recurse); mutually exclusive "
+                         "with --in")
+    ap.add_argument("--out-dir", dest="out_dir",
+                    help="output directory for --in-glob mode "
+                         "(default: next to each input)")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count(),
+                    help="worker processes for --in-glob mode "
+                         "(default: CPU count)")
+    ap.add_argument("--format", dest="fmt", choices=("png", "svg"),
+                    default="png",
+                    help="output format; svg skips rasterization "
+                         "entirely (default png)")
+    ap.add_argument("--scale", type=float, default=1.0,
+                    help="render scale factor (default 1.0)")
+    ap.add_argument("--compress-level", type=int, default=6,
+                    choices=range(10), metavar="0-9",
+                    help="PNG zlib compression level; lower is a much "
+                         "faster encode at a somewhat larger file "
+                         "(default 6)")
+    ap.add_argument("--fast", action="store_true",
+                    help="quantize to a 64-color palette PNG; faster "
+                         "encode and smaller file at slightly reduced "
+                         "antialiasing quality")
+    args = ap.parse_args(argv)
+
+    if bool(args.in_path) == bool(args.in_glob):
+        ap.error("exactly one of --in or --in-glob is required")
+
+    if args.in_path and os.path.isdir(args.in_path):
+        # A directory for --in is shorthand for recursive batch mode.
+        args.in_glob = os.path.join(args.in_path, "**", "*.flow-meta.xml")
+        args.in_path = None
+        if args.out_path and not args.out_dir:
+            args.out_dir = args.out_path
+
+    if args.in_glob:
+        paths = sorted(glob.glob(args.in_glob, recursive=True))
+        if not paths:
+            print("no files match %s" % args.in_glob, file=sys.stderr)
+            return 1
+        ext = "." + args.fmt
+        jobs = []
+        for path in paths:
+            out_path = _default_out(path, ext)
+            if args.out_dir:
+                os.makedirs(args.out_dir, exist_ok=True)
+                out_path = os.path.join(args.out_dir,
+                                        os.path.basename(out_path))
+            jobs.append((path, out_path, args.scale, args.compress_level,
+                         args.fmt, args.fast))
+        # Rendering is CPU-bound and per-file independent; worker
+        # processes sidestep both the GIL and repeated parse cost.
+        with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+            for line in ex.map(_render_one, jobs):
+                print(line)
+        return 0
+
+    out_path = args.out_path or _default_out(args.in_path, "." + args.fmt)
+    message = _render_one((args.in_path, out_path, args.scale,
+                           args.compress_level, args.fmt, args.fast))
+    ok = message.startswith("wrote ")
+    print(message, file=sys.stdout if ok else sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())